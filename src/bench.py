@@ -0,0 +1,292 @@
+"""
+Uçtan uca ölçekleme benchmark'ı.
+
+Her boyut için loadgen.py ile sentetik readings.txt üretir; load_readings,
+aggregate_and_write, parçalı toplulaştırma ve dashboard yükleyicilerini ayrı alt süreçlerde ölçer
+(süre + bellek tepe değerleri) ve sonuçları JSON olarak yazar. Sürümler arası
+karşılaştırma için çıktı dosyasını saklayın.
+
+  python bench.py --sizes 1d,1w,1m --rate 1 --output bench_results.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BASE = Path(__file__).resolve().parent
+# Veri setleri sabit bir başlangıca göre üretilir; böylece yeniden kullanılan dosyalar
+# ve sonuçlar çalıştırma zamanından bağımsızdır (ham veri penceresi veri sonuna göre alınır)
+DATASET_START = pd.Timestamp("2025-01-01T00:00:00")
+
+# Hedef adı -> worker içinde çağrılacak fonksiyon (sıra önemli: agg yükleyiciler CSV'lere ihtiyaç duyar)
+TARGETS = [
+    "load_readings",
+    "aggregate_and_write",
+    "aggregate_chunked_and_write",
+    "dashboard.read_raw_last_minutes",
+    "dashboard.read_agg_minute",
+    "dashboard.read_agg_hour",
+]
+# --verify-chunked: saat kovası bloğa sığmayacak yoğunlukta veri, farklı bellek tavanları
+VERIFY_SIZE = "4h"
+VERIFY_RATE = 10.0
+VERIFY_LIMITS_MB = (4, 12, 64)
+
+
+def _setup_logging(workdir: Path):
+    """
+    proccessor_txt/collector içe aktarılırken kendi basicConfig'leri ile depodaki app.log'a
+    yazmasın diye loglar önceden çalışma klasörüne yönlendirilir (basicConfig ikinci kez etkisizdir).
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+        handlers=[
+            logging.StreamHandler(),
+            logging.FileHandler(workdir / "bench.log", encoding="utf-8"),
+        ],
+    )
+
+
+# ---------- Worker (alt süreç) ----------
+def _max_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS byte döndürür
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _prepare(target: str, readings: Path, workdir: Path, window_end: pd.Timestamp | None):
+    """Ölçülecek çağrıyı hazırla; hazırlık (girdi yükleme) süreye dahil edilmez."""
+    import proccessor_txt
+    import dashboard_data
+
+    minute_csv, hour_csv = workdir / "minute_agg.csv", workdir / "hour_agg.csv"
+    proccessor_txt.READINGS_TXT = readings
+    proccessor_txt.MINUTE_AGG_CSV = minute_csv
+    proccessor_txt.HOUR_AGG_CSV = hour_csv
+
+    if target == "load_readings":
+        return proccessor_txt.load_readings
+    if target == "aggregate_and_write":
+        df = proccessor_txt.load_readings()
+        return lambda: proccessor_txt.aggregate_and_write(df)
+    if target == "aggregate_chunked_and_write":
+        # Girdi dahil uçtan uca (dosya -> CSV); tavan settings.PROCESSOR_MEMORY_LIMIT_MB
+        return proccessor_txt.aggregate_chunked_and_write
+    if target == "dashboard.read_raw_last_minutes":
+        return lambda: dashboard_data.read_raw_last_minutes(readings, 30, now=window_end)
+    if target == "dashboard.read_agg_minute":
+        return lambda: dashboard_data.read_agg(minute_csv)
+    if target == "dashboard.read_agg_hour":
+        return lambda: dashboard_data.read_agg(hour_csv)
+    raise SystemExit(f"Bilinmeyen hedef: {target}")
+
+
+def run_worker(
+    target: str, readings: Path, workdir: Path, repeat: int, window_end: pd.Timestamp | None = None
+) -> dict:
+    fn = _prepare(target, readings, workdir, window_end)
+    setup_rss = _max_rss_mb()
+
+    times: list[float] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    rss_after = _max_rss_mb()
+
+    # tracemalloc süreyi bozduğu için bellek ölçümü ayrı bir çalıştırmada yapılır
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "target": target,
+        "seconds_min": min(times),
+        "seconds_median": float(np.median(times)),
+        "runs": repeat,
+        "py_alloc_peak_mb": peak / (1024 * 1024),
+        "max_rss_mb": rss_after,
+        "max_rss_setup_mb": setup_rss,
+    }
+
+
+# ---------- Koordinatör ----------
+def _env_info() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE,
+            capture_output=True, text=True, timeout=5, check=False
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _dataset(workdir: Path, size: str, rate: float, seed: int) -> dict:
+    """Veri setini üret (aynı parametre ve başlangıçla daha önce üretildiyse yeniden kullan)."""
+    path = workdir / f"readings_{size}_{rate:g}hz_s{seed}.txt"
+    meta_path = path.with_suffix(".json")
+    if path.exists() and meta_path.exists():
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("start") == DATASET_START.isoformat():
+            return meta
+
+    from loadgen import generate, parse_duration  # collector (OpenCV) bağımlılığı yalnızca üretimde
+    duration = parse_duration(size)
+    t0 = time.perf_counter()
+    meta = generate(path, DATASET_START.to_pydatetime(), duration, rate, seed=seed)
+    meta["generate_seconds"] = time.perf_counter() - t0
+    meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return meta
+
+
+def run_suite(sizes: list[str], rate: float, repeat: int, workdir: Path, targets: list[str], seed: int) -> dict:
+    _setup_logging(workdir)  # veri üretimi collector'ı içe aktarır
+    results: list[dict] = []
+    for size in sizes:
+        data = _dataset(workdir, size, rate, seed)
+        window_end = pd.Timestamp(data["start"]) + pd.Timedelta(data["duration"])
+        print(f"[{size} @ {rate:g} Hz] {data['lines']} satır, {data['bytes'] / 1e6:.1f} MB")
+        case_dir = workdir / f"out_{size}_{rate:g}hz"
+        case_dir.mkdir(exist_ok=True)
+        for target in targets:
+            proc = subprocess.run(
+                [sys.executable, str(Path(__file__).resolve()), "--worker", target,
+                 "--readings", data["path"], "--workdir", str(case_dir), "--repeat", str(repeat),
+                 "--window-end", window_end.isoformat()],
+                cwd=BASE, capture_output=True, text=True, check=False
+            )
+            if proc.returncode != 0:
+                print(f"  {target:<34} HATA\n{proc.stderr.strip()}")
+                results.append({"size": size, "rate_hz": rate, "target": target,
+                                "error": proc.stderr.strip().splitlines()[-1:]})
+                continue
+            res = json.loads(proc.stdout.strip().splitlines()[-1])
+            res.update({"size": size, "rate_hz": rate, "lines": data["lines"],
+                        "values": data["values"], "file_bytes": data["bytes"]})
+            results.append(res)
+            rss = f"{res['max_rss_mb']:.0f} MB" if res["max_rss_mb"] is not None else "-"
+            print(f"  {target:<34} {res['seconds_median']:8.3f} s  "
+                  f"alloc-peak {res['py_alloc_peak_mb']:8.1f} MB  rss {rss}")
+    return {"env": _env_info(), "results": results}
+
+
+def verify_chunked(workdir: Path, seed: int) -> bool:
+    """Parçalı mod çıktısını farklı bellek tavanlarında normal mod ile bayt bayt karşılaştırır."""
+    _setup_logging(workdir)
+    import proccessor_txt
+
+    data = _dataset(workdir, VERIFY_SIZE, VERIFY_RATE, seed)
+    readings = Path(data["path"])
+    print(f"[doğrulama {VERIFY_SIZE} @ {VERIFY_RATE:g} Hz] {data['lines']} satır")
+    proccessor_txt.READINGS_TXT = readings
+    df = proccessor_txt.load_readings()
+    expected = [proccessor_txt.summarize(df, freq).to_csv(index=False) for freq in ("min", "h")]
+    del df
+
+    ok = True
+    for limit_mb in VERIFY_LIMITS_MB:
+        got = [g.to_csv(index=False) for g in proccessor_txt.aggregate_chunked(readings, limit_mb)]
+        same = [a == b for a, b in zip(got, expected)]
+        print(f"  {limit_mb:>4} MB  dakika {'aynı' if same[0] else 'FARKLI'}  saat {'aynı' if same[1] else 'FARKLI'}")
+        ok = ok and all(same)
+    return ok
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Processor ve dashboard yükleyicilerini veri boyutuna göre ölçer."
+    )
+    parser.add_argument(
+        "--sizes",
+        default="1d,1w,1m",
+        help="Virgülle ayrılmış süreler: 1d, 1w, 1m, 6m, 1y veya pandas süresi (varsayılan: 1d,1w,1m)."
+    )
+    parser.add_argument("--rate", type=float, default=1.0, help="Örnekleme hızı, Hz (varsayılan: 1).")
+    parser.add_argument("--repeat", type=int, default=3, help="Hedef başına tekrar (varsayılan: 3).")
+    parser.add_argument("--targets", default=",".join(TARGETS), help="Ölçülecek hedefler (virgülle).")
+    parser.add_argument("--seed", type=int, default=0, help="Veri üretimi tohumu.")
+    parser.add_argument(
+        "--workdir",
+        type=Path,
+        default=None,
+        help="Veri setleri/çıktılar için klasör (varsayılan: geçici klasör; verilirse yeniden kullanılır)."
+    )
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"), help="JSON sonuç dosyası.")
+    parser.add_argument(
+        "--verify-chunked",
+        action="store_true",
+        help="Ölçüm yerine parçalı toplulaştırmanın normal mod ile aynı çıktıyı verdiğini doğrula "
+             "(farklıysa çıkış kodu 1)."
+    )
+    # İç kullanım: tek hedefi ölçen alt süreç
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--readings", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--window-end", type=pd.Timestamp, help=argparse.SUPPRESS)
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    if args.worker:
+        _setup_logging(args.workdir)
+        print(json.dumps(run_worker(args.worker, args.readings, args.workdir, args.repeat, args.window_end)))
+        return 0
+
+    if args.verify_chunked:
+        if args.workdir is None:
+            with tempfile.TemporaryDirectory(prefix="ocr-bench-") as tmp:
+                ok = verify_chunked(Path(tmp), args.seed)
+        else:
+            args.workdir.mkdir(parents=True, exist_ok=True)
+            ok = verify_chunked(args.workdir, args.seed)
+        return 0 if ok else 1
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    unknown = set(targets) - set(TARGETS)
+    if unknown:
+        raise SystemExit(f"Bilinmeyen hedef(ler): {', '.join(sorted(unknown))}")
+
+    if args.workdir is None:
+        with tempfile.TemporaryDirectory(prefix="ocr-bench-") as tmp:
+            report = run_suite(sizes, args.rate, args.repeat, Path(tmp), targets, args.seed)
+    else:
+        args.workdir.mkdir(parents=True, exist_ok=True)
+        report = run_suite(sizes, args.rate, args.repeat, args.workdir, targets, args.seed)
+
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Sonuçlar: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,39 +1,127 @@
 import argparse
+import json
+import logging
 import os
 import subprocess
 import sys
-from dataclasses import dataclass
+import threading
+import time
+from dataclasses import asdict, dataclass, field, fields
 from pathlib import Path
 from typing import Iterator
 
 import cv2
 
+from settings import (
+    CAMERA_PROBE_TIMEOUT_SEC, CAMERA_CACHE_FILE, CAMERA_CACHE_TTL_SEC, CAMERA_CACHE_NEGATIVE_TTL_SEC,
+    CAMERA_CACHE_TIMEOUT_TTL_SEC
+)
+
+log = logging.getLogger("camera_scanner")
+
+V4L_BASE = Path("/sys/class/video4linux")
+
+# Desteklenen çözünürlük taramasında denenecek yaygın modlar
+COMMON_RESOLUTIONS = [(320, 240), (640, 480), (800, 600), (1280, 720), (1920, 1080)]
+
 
 @dataclass
 class CameraInfo:
     index: int
     name: str | None = None
     path: str | None = None
+    width: int | None = None
+    height: int | None = None
+    fps: float | None = None
+    modes: list[list[float]] = field(default_factory=list)
 
 
-def probe_indices(max_index: int, backend: int) -> list[int]:
-    """Return indices that can be opened with OpenCV."""
-    found: list[int] = []
-    for idx in range(max_index + 1):
-        cap = cv2.VideoCapture(idx, backend)
+def _supported_modes(cap: cv2.VideoCapture) -> list[list[float]]:
+    """Yaygın çözünürlükleri dener; sürücünün kabul ettiklerini [w, h, fps] olarak döndürür."""
+    modes: list[list[float]] = []
+    for w, h in COMMON_RESOLUTIONS:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, w)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, h)
+        got = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        if got == (w, h):
+            modes.append([w, h, round(cap.get(cv2.CAP_PROP_FPS), 2)])
+    return modes
+
+
+def probe_device(idx: int, backend: int, query_modes: bool = False) -> CameraInfo | None:
+    """Tek bir indeksi açıp kare okur; başarılıysa mevcut çözünürlük/FPS ile döndürür."""
+    cap = cv2.VideoCapture(idx, backend)
+    try:
         if not cap.isOpened():
-            cap.release()
-            continue
+            return None
         ok, _ = cap.read()
+        if not ok:
+            return None
+        info = CameraInfo(
+            index=idx,
+            width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            fps=round(cap.get(cv2.CAP_PROP_FPS), 2),
+        )
+        if query_modes:
+            info.modes = _supported_modes(cap)
+        return info
+    finally:
         cap.release()
-        if ok:
-            found.append(idx)
-    return found
+
+
+def probe_devices(
+    indices: list[int],
+    backend: int,
+    timeout: float = CAMERA_PROBE_TIMEOUT_SEC,
+    query_modes: bool = False,
+    stop_at_first: bool = False,
+) -> tuple[list[CameraInfo], list[int]]:
+    """
+    İndeksleri paralel yoklar. (bulunanlar, zaman aşımına uğrayan indeksler) döndürür.
+    Takılan bir cihaz sürecin kapanmasını engellemesin diye daemon thread kullanılır.
+    stop_at_first: sonuçlar öncelik sırasıyla beklenir; önceki tüm indeksler başarısızken biri
+    açıldığında geri kalanı beklenmez (bunlar ne bulunan ne de zaman aşımı olarak raporlanır).
+    """
+    results: dict[int, CameraInfo | None] = {}
+
+    def worker(idx: int):
+        try:
+            results[idx] = probe_device(idx, backend, query_modes)
+        except cv2.error:
+            results[idx] = None
+
+    threads = [
+        threading.Thread(target=worker, args=(idx,), name=f"cam-probe-{idx}", daemon=True)
+        for idx in indices
+    ]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + timeout
+    timed_out: list[int] = []
+    decided: list[int] = []
+    for idx, t in zip(indices, threads):
+        t.join(max(0.0, deadline - time.monotonic()))
+        if t.is_alive():
+            timed_out.append(idx)
+            continue
+        decided.append(idx)
+        if stop_at_first and results.get(idx) is not None:
+            break
+
+    found = [results[idx] for idx in decided if results.get(idx) is not None]
+    return found, timed_out
+
+
+def probe_indices(max_index: int, backend: int) -> list[int]:
+    """Return indices that can be opened with OpenCV."""
+    found, _ = probe_devices(candidate_indices(max_index), backend)
+    return [info.index for info in found]
 
 
 def iter_linux_devices() -> Iterator[tuple[int, str]]:
     """Yield (index, name) pairs for Linux video devices."""
-    base = Path("/sys/class/video4linux")
+    base = V4L_BASE
     if not base.exists():
         return iter(())
     devices: list[tuple[int, str]] = []
@@ -52,6 +140,27 @@ def iter_linux_devices() -> Iterator[tuple[int, str]]:
     return iter(devices)
 
 
+def _is_capture_node(idx: int) -> bool:
+    """UVC kameralar metadata için ek bir düğüm açar (index > 0); bunlar kare vermez."""
+    try:
+        return (V4L_BASE / f"video{idx}" / "index").read_text(encoding="utf-8").strip() in ("", "0")
+    except OSError:
+        return True
+
+
+def candidate_indices(max_index: int) -> list[int]:
+    """
+    Yoklanacak indeksler. Linux'ta /sys/class/video4linux mevcutsa yalnızca orada
+    görünen yakalama düğümleri döner; böylece olmayan cihazlar hiç açılmaz.
+    """
+    if sys.platform.startswith("linux") and V4L_BASE.exists():
+        return sorted(
+            idx for idx, _ in iter_linux_devices()
+            if idx <= max_index and _is_capture_node(idx)
+        )
+    return list(range(max_index + 1))
+
+
 def list_windows_devices() -> list[str]:
     """Return a best-effort list of camera names on Windows."""
     if os.name != "nt":
@@ -80,9 +189,188 @@ def list_windows_devices() -> list[str]:
     return [line.strip() for line in output.splitlines() if line.strip()]
 
 
-def gather_info(max_index: int, backend: int) -> list[CameraInfo]:
-    indices = probe_indices(max_index, backend)
-    infos: list[CameraInfo] = [CameraInfo(index=i) for i in indices]
+# ---------- Önbellek ----------
+def device_identity(idx: int, backend: int) -> str:
+    """
+    Önbellek anahtarı. Linux'ta cihaz adı + fiziksel bağlantı yolu kullanılır; kamera
+    başka porta takılırsa veya indeks değişirse kayıt geçersiz olur.
+    """
+    key = f"{backend}:video{idx}"
+    node = V4L_BASE / f"video{idx}"
+    if sys.platform.startswith("linux") and node.exists():
+        try:
+            name = (node / "name").read_text(encoding="utf-8").strip()
+        except OSError:
+            name = ""
+        key += f":{name}:{os.path.realpath(node / 'device')}"
+    return key
+
+
+def _node_stamp(idx: int) -> float | None:
+    """Linux'ta /dev/videoN düğümünün ctime'ı; cihaz çıkarılıp takılınca değişir."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return os.stat(f"/dev/video{idx}").st_ctime
+    except OSError:
+        return None
+
+
+def load_cache(path: Path = CAMERA_CACHE_FILE) -> dict[str, dict]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_cache(cache: dict[str, dict], path: Path = CAMERA_CACHE_FILE) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    try:
+        tmp.write_text(json.dumps(cache, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, path)  # atomik
+    except OSError:
+        pass
+
+
+def _valid_entry(entry, idx: int) -> bool:
+    """Elle düzenlenmiş veya eski şemalı kayıtlar önbellek ıskası sayılır."""
+    if not isinstance(entry, dict) or not isinstance(entry.get("ok"), bool):
+        return False
+    if not isinstance(entry.get("checked"), (int, float)):
+        return False
+    info = entry.get("info")
+    if not isinstance(info, dict) or info.get("index") != idx:
+        return False
+    if not set(info) <= {f.name for f in fields(CameraInfo)}:
+        return False
+    modes = info.get("modes", [])
+    return isinstance(modes, list) and all(
+        isinstance(m, list) and len(m) == 3 and all(isinstance(v, (int, float)) for v in m)
+        for m in modes
+    )
+
+
+def _cached_entry(cache: dict[str, dict], idx: int, backend: int) -> dict | None:
+    entry = cache.get(device_identity(idx, backend))
+    if not _valid_entry(entry, idx):
+        return None
+    # Tüm kayıtlar süreyle sınırlı; Linux'ta cihaz düğümü yeniden oluştuysa kayıt hemen geçersiz
+    if entry.get("timed_out"):
+        ttl = CAMERA_CACHE_TIMEOUT_TTL_SEC
+    elif not entry["ok"]:
+        ttl = CAMERA_CACHE_NEGATIVE_TTL_SEC
+    else:
+        ttl = CAMERA_CACHE_TTL_SEC
+    if time.time() - entry["checked"] > ttl:
+        return None
+    if entry.get("node") != _node_stamp(idx):
+        return None
+    return entry
+
+
+def _store_results(
+    cache: dict[str, dict], indices: list[int], found: list[CameraInfo], timed_out: list[int], backend: int
+) -> None:
+    """Yoklama sonuçlarını önbelleğe yaz; zaman aşımı kısa ömürlü olumsuz kayıt olarak saklanır."""
+    found_map = {info.index: info for info in found}
+    now = time.time()
+    for idx in indices:
+        info = found_map.get(idx)
+        entry = {
+            "ok": info is not None,
+            "checked": now,
+            "info": asdict(info) if info else {"index": idx},
+            "node": _node_stamp(idx),
+        }
+        if idx in timed_out:
+            entry["timed_out"] = True
+        cache[device_identity(idx, backend)] = entry
+
+
+def _split_candidates(
+    cache: dict[str, dict], candidates: list[int], backend: int
+) -> tuple[list[int], list[int]]:
+    """(önbellekte sorunu olmayanlar, çalışmadığı/takıldığı bilinenler); öncelik sırası korunur."""
+    usable: list[int] = []
+    known_bad: list[int] = []
+    for idx in candidates:
+        entry = _cached_entry(cache, idx, backend)
+        if entry is not None and not entry.get("ok"):
+            known_bad.append(idx)
+        else:
+            usable.append(idx)
+    return usable, known_bad
+
+
+def first_available(
+    candidates: list[int],
+    backend: int = cv2.CAP_ANY,
+    timeout: float = CAMERA_PROBE_TIMEOUT_SEC,
+) -> int | None:
+    """
+    Collector için: adayları paralel ve zaman aşımıyla yoklar, öncelik sırasına göre ilk
+    yanıt veren indeksi döndürür ve sonuçları önbelleğe yazar. Önbellekte çalışmadığı veya
+    takıldığı bilinen indeksler yalnızca diğerlerinin hiçbiri açılmazsa yoklanır.
+    """
+    cache = load_cache()
+    for group in _split_candidates(cache, candidates, backend):
+        if not group:
+            continue
+        found, timed_out = probe_devices(group, backend, timeout, stop_at_first=True)
+        # Kazanandan sonraki indeksler beklenmedi; sonuçları belirsiz olduğu için yazılmaz
+        decided = group[:group.index(found[0].index) + 1] if found else group
+        _store_results(cache, decided, found[:1], timed_out, backend)
+        save_cache(cache)
+        if timed_out:
+            log.warning("Kamera yanıt vermedi (%.1f sn): index %s", timeout, timed_out)
+        if found:
+            return found[0].index
+    return None
+
+
+def scan(
+    max_index: int,
+    backend: int,
+    timeout: float = CAMERA_PROBE_TIMEOUT_SEC,
+    query_modes: bool = False,
+    use_cache: bool = True,
+) -> tuple[list[CameraInfo], list[int]]:
+    """
+    Önbellekte geçerli kaydı olmayan adayları paralel yoklar ve önbelleği günceller.
+    (bulunanlar, zaman aşımına uğrayan indeksler) döndürür; önbellekte takıldığı kayıtlı
+    indeksler de zaman aşımı olarak raporlanır.
+    """
+    cache = load_cache() if use_cache else {}
+    infos: list[CameraInfo] = []
+    to_probe: list[int] = []
+    timed_out: list[int] = []
+    for idx in candidate_indices(max_index):
+        entry = _cached_entry(cache, idx, backend)
+        if entry is None or (query_modes and entry.get("ok") and not entry["info"].get("modes")):
+            to_probe.append(idx)
+        elif entry.get("ok"):
+            infos.append(CameraInfo(**entry["info"]))
+        elif entry.get("timed_out"):
+            timed_out.append(idx)
+
+    if to_probe:
+        found, probe_timed_out = probe_devices(to_probe, backend, timeout, query_modes)
+        _store_results(cache, to_probe, found, probe_timed_out, backend)
+        infos.extend(found)
+        timed_out.extend(probe_timed_out)
+        save_cache(cache)
+    return sorted(infos, key=lambda info: info.index), sorted(timed_out)
+
+
+def gather_info(
+    max_index: int,
+    backend: int,
+    timeout: float = CAMERA_PROBE_TIMEOUT_SEC,
+    query_modes: bool = False,
+    use_cache: bool = True,
+) -> tuple[list[CameraInfo], list[int]]:
+    infos, timed_out = scan(max_index, backend, timeout, query_modes, use_cache)
     if sys.platform.startswith("linux"):
         name_map = dict(iter_linux_devices())
         for info in infos:
@@ -93,7 +381,7 @@ def gather_info(max_index: int, backend: int) -> list[CameraInfo]:
         names = list_windows_devices()
         for idx, info in enumerate(infos):
             info.name = names[idx] if idx < len(names) else None
-    return infos
+    return infos, timed_out
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -112,6 +400,22 @@ def build_parser() -> argparse.ArgumentParser:
         default=cv2.CAP_ANY,
         help="OpenCV backend sabiti (varsayılan: CAP_ANY)."
     )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=CAMERA_PROBE_TIMEOUT_SEC,
+        help=f"Cihaz başına zaman aşımı, saniye (varsayılan: {CAMERA_PROBE_TIMEOUT_SEC})."
+    )
+    parser.add_argument(
+        "--modes",
+        action="store_true",
+        help="Desteklenen çözünürlük/FPS modlarını da raporla (daha yavaş)."
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Önbelleği yok sayıp tüm cihazları yeniden yokla."
+    )
     return parser
 
 
@@ -119,7 +423,15 @@ def main() -> int:
     parser = build_parser()
     args = parser.parse_args()
 
-    infos = gather_info(args.max_index, args.backend)
+    infos, timed_out = gather_info(
+        args.max_index, args.backend, args.timeout,
+        query_modes=args.modes, use_cache=not args.refresh
+    )
+    if timed_out:
+        print(
+            f"Zaman aşımı ({args.timeout:g} sn): index {', '.join(map(str, timed_out))} "
+            "yanıt vermedi (meşgul/takılı olabilir; --timeout ile süreyi artırın)."
+        )
     if not infos:
         print("Kamera bulunamadı.")
         return 1
@@ -131,7 +443,13 @@ def main() -> int:
             details.append(f"path={info.path}")
         if info.name:
             details.append(f"name={info.name}")
+        if info.width and info.height:
+            details.append(f"res={info.width}x{info.height}")
+        if info.fps:
+            details.append(f"fps={info.fps:g}")
         print(" - " + ", ".join(details))
+        for w, h, fps in info.modes:
+            print(f"     mod: {int(w)}x{int(h)} @ {fps:g} fps")
     return 0
 
 
@@ -10,6 +10,7 @@ import cv2
 import numpy as np
 import pytesseract
 
+from camera_scanner import first_available
 from settings import (
     READINGS_TXT, LOG_FILE, TESSERACT_EXE,
     SAMPLE_PERIOD_SEC, CAMERA_INDEX_CANDIDATES
@@ -84,9 +85,12 @@ def extract_floats(raw_text: str) -> list[float]:
             log.debug("float parse hata: %s", n)
     return vals
 
-def append_to_txt(path: Path, floats: list[float]) -> None:
-    ts = datetime.now().isoformat(timespec="seconds")
-    line = f"{ts}\t" + ", ".join(map(str, floats)) + "\n"
+def format_line(ts: datetime, floats: list[float]) -> str:
+    """readings.txt satır formatı: ISO_TS \t "v1, v2, ..." (loadgen.py de bunu kullanır)."""
+    return f"{ts.isoformat(timespec='seconds')}\t" + ", ".join(map(str, floats)) + "\n"
+
+def append_to_txt(path: Path, floats: list[float], ts: datetime | None = None) -> None:
+    line = format_line(ts or datetime.now(), floats)
     try:
         with open(path, "a", encoding="utf-8") as f:
             f.write(line)
@@ -105,6 +109,21 @@ def assert_gui_available():
             "Çözüm: 'pip uninstall -y opencv-python-headless' ve 'pip install opencv-python'."
         ) from e
 
+def open_camera(candidates: list[int]) -> cv2.VideoCapture | None:
+    """
+    Adayları paralel ve zaman aşımıyla yoklar (camera_scanner.first_available), öncelik
+    sırasına göre ilk yanıt veren kamerayı açar. Sonuçlar önbelleğe yazılır.
+    """
+    idx = first_available(candidates)
+    if idx is None:
+        return None
+    cap = cv2.VideoCapture(idx)
+    if cap.isOpened():
+        log.info("Kamera açıldı: index=%s", idx)
+        return cap
+    cap.release()
+    return None
+
 # ---------- Main loop ----------
 def main():
     ensure_tesseract_path()
@@ -114,16 +133,7 @@ def main():
     log.info("Kayıt dosyası: %s", READINGS_TXT)
 
     # Kamera açma (retry ile)
-    cam_index_candidates = CAMERA_INDEX_CANDIDATES
-    cap = None
-    for idx in cam_index_candidates:
-        cap_try = cv2.VideoCapture(idx)
-        if cap_try.isOpened():
-            cap = cap_try
-            log.info("Kamera açıldı: index=%s", idx)
-            break
-        cap_try.release()
-
+    cap = open_camera(CAMERA_INDEX_CANDIDATES)
     if cap is None:
         raise SystemExit("Kamera açılamadı. Başka index deneyin (0/1/2) veya "
                          "kamerayı kullanan uygulamayı kapatın.")
@@ -178,6 +188,9 @@ def main():
                 try:
                     r = cv2.selectROI(WINDOW_MAIN, frame, fromCenter=False, showCrosshair=True)
                     roi = tuple(map(int, r)) if r and sum(r) > 0 else None
+                    if roi:
+                        # runtime.py için settings.RUNTIME_ROI'ye kopyalanabilir
+                        log.info("ROI seçildi: %s", roi)
                     cv2.waitKey(1)
                 except cv2.error:
                     log.exception("ROI seçiminde hata.")
@@ -0,0 +1,47 @@
+"""
+Dashboard dosya yükleyicileri (Streamlit'ten bağımsız).
+dashboard_txt.py bunları st.cache_data ile sarar; bench.py doğrudan ölçer.
+"""
+import pandas as pd
+from pathlib import Path
+
+def _safe_float(s: str):
+    try: return float(s)
+    except: return None
+
+def read_raw_last_minutes(path: Path, minutes: int, now: pd.Timestamp | None = None) -> pd.DataFrame:
+    """Son `minutes` dakikanın ham değerleri; pencere sonu `now` (varsayılan: şimdi)."""
+    rows = []
+    if not path.exists():
+        return pd.DataFrame(columns=["ts","value"])
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for raw in f:
+            line = raw.strip()
+            if not line or "\t" not in line: continue
+            ts_str, vals = line.split("\t", 1)
+            try:
+                ts = pd.to_datetime(ts_str)
+            except: continue
+            for p in vals.split(","):
+                p = p.strip()
+                v = _safe_float(p)
+                if v is not None: rows.append((ts, v))
+    df = pd.DataFrame(rows, columns=["ts","value"])
+    if df.empty: return df
+    df = df.sort_values("ts")
+    if now is None:
+        now = pd.Timestamp.utcnow().tz_localize(None)
+    cutoff = now - pd.Timedelta(minutes=minutes)
+    df = df[df["ts"] >= cutoff]
+    return df
+
+def read_agg(path: Path) -> pd.DataFrame:
+    if not path.exists():
+        return pd.DataFrame(columns=["bucket_start","cnt","avg","min","max"])
+    try:
+        df = pd.read_csv(path)
+        if "bucket_start" in df.columns:
+            df["bucket_start"] = pd.to_datetime(df["bucket_start"])
+        return df
+    except:
+        return pd.DataFrame(columns=["bucket_start","cnt","avg","min","max"])
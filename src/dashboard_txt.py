@@ -1,10 +1,14 @@
+import json
+import socket
+
 import pandas as pd
 import streamlit as st
 from pathlib import Path
 
+from dashboard_data import read_raw_last_minutes, read_agg
 from settings import (
     READINGS_TXT, MINUTE_AGG_CSV, HOUR_AGG_CSV,
-    DASH_LIVE_WINDOW_MIN
+    DASH_LIVE_WINDOW_MIN, DASH_AGG_WINDOW_MIN, RUNTIME_PUBLISH_HOST, RUNTIME_PUBLISH_PORT
 )
 
 # ---------- Sayfa ----------
@@ -44,45 +48,37 @@ if auto_refresh:
         st.sidebar.warning("Oto-yenile için: pip install streamlit-autorefresh")
 
 # ---------- Veri Yükleme ----------
-def _safe_float(s: str):
-    try: return float(s)
-    except: return None
-
 @st.cache_data(ttl=5)
 def load_raw_last_minutes(minutes: int) -> pd.DataFrame:
-    rows = []
-    if not READINGS_TXT.exists():
-        return pd.DataFrame(columns=["ts","value"])
-    with open(READINGS_TXT, "r", encoding="utf-8", errors="ignore") as f:
-        for raw in f:
-            line = raw.strip()
-            if not line or "\t" not in line: continue
-            ts_str, vals = line.split("\t", 1)
-            try:
-                ts = pd.to_datetime(ts_str)
-            except: continue
-            for p in vals.split(","):
-                p = p.strip()
-                v = _safe_float(p)
-                if v is not None: rows.append((ts, v))
-    df = pd.DataFrame(rows, columns=["ts","value"])
-    if df.empty: return df
-    df = df.sort_values("ts")
-    cutoff = pd.Timestamp.utcnow().tz_localize(None) - pd.Timedelta(minutes=minutes)
-    df = df[df["ts"] >= cutoff]
-    return df
+    return read_raw_last_minutes(READINGS_TXT, minutes)
 
 @st.cache_data(ttl=5)
 def load_agg(path: Path) -> pd.DataFrame:
-    if not path.exists():
-        return pd.DataFrame(columns=["bucket_start","cnt","avg","min","max"])
+    return read_agg(path)
+
+@st.cache_data(ttl=5)
+def load_runtime_snapshot(minutes: int) -> dict | None:
+    """runtime.py çalışıyorsa verileri yayıncıdan al (dosya parse yok); değilse None."""
     try:
-        df = pd.read_csv(path)
-        if "bucket_start" in df.columns:
-            df["bucket_start"] = pd.to_datetime(df["bucket_start"])
-        return df
-    except:
-        return pd.DataFrame(columns=["bucket_start","cnt","avg","min","max"])
+        with socket.create_connection((RUNTIME_PUBLISH_HOST, RUNTIME_PUBLISH_PORT), timeout=0.5) as s:
+            s.sendall((json.dumps({
+                "op": "snapshot", "minutes": minutes, "agg_minutes": DASH_AGG_WINDOW_MIN
+            }) + "\n").encode("utf-8"))
+            s.settimeout(5)
+            with s.makefile("r", encoding="utf-8") as f:
+                return json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+
+def raw_from_snapshot(snapshot: dict) -> pd.DataFrame:
+    df = pd.DataFrame(snapshot.get("readings", []), columns=["ts","value"])
+    df["ts"] = pd.to_datetime(df["ts"])
+    return df
+
+def agg_from_snapshot(snapshot: dict, key: str) -> pd.DataFrame:
+    df = pd.DataFrame(snapshot.get(key, []), columns=["bucket_start","cnt","avg","min","max"])
+    df["bucket_start"] = pd.to_datetime(df["bucket_start"])
+    return df
 
 def kpis_for_raw(df: pd.DataFrame):
     if df.empty: return 0, None, None
@@ -95,11 +91,14 @@ def download_df_button(df: pd.DataFrame, filename: str, label: str):
     st.download_button(label, df.to_csv(index=False).encode("utf-8"), filename, "text/csv")
 
 # ---------- Sekmeler ----------
+snapshot = load_runtime_snapshot(live_window_min)
+if snapshot is not None:
+    st.sidebar.caption(f"Kaynak: runtime yayıncısı ({RUNTIME_PUBLISH_HOST}:{RUNTIME_PUBLISH_PORT})")
 tab1, tab2, tab3 = st.tabs(["🔴 Canlı/Anlık", "🕒 Dakika Özeti", "🗓 Saat Özeti"])
 
 with tab1:
     st.subheader("Ham Değerler (son N dakika)")
-    df = load_raw_last_minutes(live_window_min)
+    df = raw_from_snapshot(snapshot) if snapshot else load_raw_last_minutes(live_window_min)
     if df.empty:
         st.warning("readings.txt yok veya içinde uygun veri bulunamadı. collector.py çalışıyor mu?")
     else:
@@ -124,7 +123,8 @@ with tab1:
 
 with tab2:
     st.subheader("Dakika Bazlı Özet")
-    m = load_agg(MINUTE_AGG_CSV).sort_values("bucket_start")
+    m = agg_from_snapshot(snapshot, "minute") if snapshot else load_agg(MINUTE_AGG_CSV)
+    m = m.sort_values("bucket_start")
     if m.empty:
         st.info("minute_agg.csv henüz oluşmadı. processor_txt.py çalışıyor mu?")
     else:
@@ -143,7 +143,8 @@ with tab2:
 
 with tab3:
     st.subheader("Saat Bazlı Özet")
-    h = load_agg(HOUR_AGG_CSV).sort_values("bucket_start")
+    h = agg_from_snapshot(snapshot, "hour") if snapshot else load_agg(HOUR_AGG_CSV)
+    h = h.sort_values("bucket_start")
     if h.empty:
         st.info("hour_agg.csv henüz oluşmadı.")
     else:
@@ -1,6 +1,8 @@
 import sys, os, subprocess, time, json, signal
 from pathlib import Path
 
+from settings import RUNTIME_ROI
+
 # Proje kökü = bu dosyanın olduğu yer
 BASE = Path(__file__).resolve().parent
 PY = sys.executable  # venv içindeki python
@@ -9,6 +11,8 @@ PY = sys.executable  # venv içindeki python
 COLLECTOR = BASE / "collector.py"
 PROCESSOR = BASE / "processor_txt.py"
 DASHBOARD = BASE / "dashboard_txt.py"
+RUNTIME = BASE / "runtime.py"
+QUERY_API = BASE / "query_api.py"
 PID_DIR = BASE / ".pids"
 LOG_DIR = BASE / "logs"
 
@@ -45,6 +49,47 @@ def _spawn(name: str, cmd: list[str], cwd: Path | None = None) -> int:
     print(f"[OK] {name} started (pid={p.pid}) | logs/{name}.log")
     return p.pid
 
+def _roi_arg(args: list[str]) -> str | None:
+    """start --unified --roi x,y,w,h değerini döndürür (yoksa None)."""
+    for i, a in enumerate(args):
+        if a == "--roi" and i + 1 < len(args):
+            return args[i + 1]
+        if a.startswith("--roi="):
+            return a.split("=", 1)[1]
+    return None
+
+def start_unified(roi: str | None = None):
+    # ROI yoksa runtime hemen çıkar; diğer servisleri boşuna başlatma
+    if roi is None and RUNTIME_ROI is None:
+        print("[HATA] ROI tanımlı değil. collector.py ile 'r' tuşuyla ROI seçip logdaki değeri "
+              "settings.RUNTIME_ROI'ye yazın veya: python launcher.py start --unified --roi x,y,w,h")
+        sys.exit(1)
+    if roi is not None:
+        parts = roi.split(",")
+        if len(parts) != 4 or not all(p.strip().lstrip("-").isdigit() for p in parts):
+            print(f"[HATA] ROI formatı: x,y,w,h (verilen: {roi})")
+            sys.exit(1)
+
+    # 1) runtime (collector + processor + yayıncı tek süreçte)
+    _spawn(
+        "runtime",
+        [PY, str(RUNTIME)] + (["--roi", roi] if roi is not None else [])
+    )
+    time.sleep(0.3)
+
+    # 2) dashboard (verileri runtime yayıncısından okur)
+    _spawn(
+        "dashboard",
+        [PY, "-m", "streamlit", "run", str(DASHBOARD)]
+    )
+    time.sleep(0.3)
+
+    # 3) sorgu API'si
+    _spawn(
+        "query",
+        [PY, str(QUERY_API)]
+    )
+
 def start():
     # 1) collector
     _spawn(
@@ -65,9 +110,16 @@ def start():
         "dashboard",
         [PY, "-m", "streamlit", "run", str(DASHBOARD)]
     )
+    time.sleep(0.3)
+
+    # 4) sorgu API'si (readings/özetler için HTTP)
+    _spawn(
+        "query",
+        [PY, str(QUERY_API)]
+    )
 
 def stop():
-    for name in ["dashboard","processor","collector"]:
+    for name in ["query","dashboard","runtime","processor","collector"]:
         pf = _pid_file(name)
         if not pf.exists():
             print(f"[i] {name}: pid yok")
@@ -91,7 +143,7 @@ def stop():
 
 def status():
     any_running = False
-    for name in ["collector","processor","dashboard"]:
+    for name in ["collector","processor","runtime","dashboard","query"]:
         pf = _pid_file(name)
         if not pf.exists():
             print(f"[ ] {name}: not running")
@@ -103,14 +155,16 @@ def status():
             pf.unlink(missing_ok=True)
         any_running = any_running or running
     if any_running:
-        print("\nLoglar: logs/collector.log, logs/processor.log, logs/dashboard.log")
+        print("\nLoglar: logs/collector.log, logs/processor.log, logs/runtime.log, logs/dashboard.log, logs/query.log")
 
 def main():
     if len(sys.argv) < 2 or sys.argv[1] not in {"start","stop","status"}:
-        print("Kullanım: python launcher.py [start|stop|status]")
+        print("Kullanım: python launcher.py [start [--unified [--roi x,y,w,h]]|stop|status]")
         sys.exit(1)
     cmd = sys.argv[1]
-    if cmd == "start":
+    if cmd == "start" and "--unified" in sys.argv[2:]:
+        start_unified(_roi_arg(sys.argv[2:]))
+    elif cmd == "start":
         start()
     elif cmd == "stop":
         stop()
@@ -0,0 +1,141 @@
+"""
+Sentetik readings.txt üretici (ölçekleme testleri ve bench.py için).
+
+Satırlar collector.format_line ile yazılır, yani append_to_txt ile birebir aynı
+formattadır. Sinyal: günlük döngülü, rastgele yürüyüşlü bir debi değeri + ölçüm
+gürültüsü; OCR hataları (hane kaybı/fazlası, sıfır), okunamayan kareler ve
+ikinci değer (sayaç toplamı) içeren çok değerli satırlar da üretilir.
+"""
+import argparse
+import math
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from collector import format_line
+
+# Kısa adlar -> süre
+PRESETS = {"1d": "1D", "1w": "7D", "1m": "30D", "6m": "182D", "1y": "365D"}
+BLOCK_SAMPLES = 100_000
+
+
+def parse_duration(text: str) -> pd.Timedelta:
+    try:
+        return pd.Timedelta(PRESETS.get(text, text))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(
+            f"Geçersiz süre: {text} (ör. {', '.join(PRESETS)} veya 12h, 90D)"
+        ) from e
+
+
+def generate(
+    path: Path,
+    start: datetime,
+    duration: pd.Timedelta,
+    rate_hz: float = 1.0,
+    multi_prob: float = 0.05,
+    glitch_prob: float = 0.01,
+    drop_prob: float = 0.02,
+    seed: int = 0,
+) -> dict:
+    """path'e [start, start + duration) aralığında rate_hz örnekli okumalar yazar; özet döndürür."""
+    rng = np.random.default_rng(seed)
+    n_total = int(duration.total_seconds() * rate_hz)
+    step_ns = int(round(1e9 / rate_hz))
+    start_ns = pd.Timestamp(start).value
+    level = 250.0        # rastgele yürüyüş durumu (bloklar arası taşınır)
+    totalizer = 10_000.0  # sayaç toplamı (çok değerli satırların ikinci değeri)
+    lines = values = 0
+
+    with open(path, "w", encoding="utf-8") as f:
+        for b0 in range(0, n_total, BLOCK_SAMPLES):
+            n = min(BLOCK_SAMPLES, n_total - b0)
+            t_ns = start_ns + (b0 + np.arange(n, dtype="int64")) * step_ns
+
+            walk = level + np.cumsum(rng.normal(0.0, 0.5 / math.sqrt(rate_hz), n))
+            walk = np.clip(walk, 20.0, 2000.0)
+            level = float(walk[-1])
+            hours = t_ns / 3.6e12
+            flow = walk * (1 + 0.3 * np.sin(2 * np.pi * hours / 24)) + rng.normal(0.0, 2.0, n)
+            flow = np.clip(flow, 0.0, None)
+
+            # OCR hataları: hane kaybı, fazladan hane, sıfır okuma
+            glitch = rng.random(n) < glitch_prob
+            kind = rng.integers(0, 3, n)
+            flow = np.where(glitch & (kind == 0), np.floor(flow / 10), flow)
+            flow = np.where(glitch & (kind == 1), flow * 10, flow)
+            flow = np.where(glitch & (kind == 2), 0.0, flow)
+
+            tot = totalizer + np.cumsum(flow) / 3600.0 / rate_hz
+            totalizer = float(tot[-1])
+
+            # Ekran hassasiyeti: çoğunlukla 1 ondalık, bazen tam sayı/2 ondalık
+            decimals = rng.choice([0, 1, 2], n, p=[0.2, 0.6, 0.2])
+            keep = rng.random(n) >= drop_prob  # okunamayan kare satır üretmez
+            multi = rng.random(n) < multi_prob
+            stamps = pd.to_datetime(t_ns).to_pydatetime()
+
+            buf: list[str] = []
+            for i in np.flatnonzero(keep):
+                floats = [round(float(flow[i]), int(decimals[i]))]
+                if multi[i]:
+                    floats.append(round(float(tot[i]), 1))
+                buf.append(format_line(stamps[i], floats))
+                values += len(floats)
+            f.writelines(buf)
+            lines += len(buf)
+
+    return {
+        "path": str(path),
+        "start": pd.Timestamp(start).isoformat(),
+        "duration": str(duration),
+        "rate_hz": rate_hz,
+        "lines": lines,
+        "values": values,
+        "bytes": path.stat().st_size,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Gerçekçi sentetik readings.txt geçmişi üretir."
+    )
+    parser.add_argument("output", type=Path, help="Yazılacak dosya.")
+    parser.add_argument(
+        "--duration",
+        type=parse_duration,
+        default=parse_duration("1d"),
+        help=f"Süre: {', '.join(PRESETS)} veya pandas süresi (varsayılan: 1d)."
+    )
+    parser.add_argument("--rate", type=float, default=1.0, help="Örnekleme hızı, Hz (varsayılan: 1).")
+    parser.add_argument(
+        "--start",
+        type=pd.Timestamp,
+        default=None,
+        help="Başlangıç zamanı (ISO). Varsayılan: şimdi - süre (son veri güncel olur)."
+    )
+    parser.add_argument("--multi-prob", type=float, default=0.05, help="Çok değerli satır oranı.")
+    parser.add_argument("--glitch-prob", type=float, default=0.01, help="OCR hatası oranı.")
+    parser.add_argument("--drop-prob", type=float, default=0.02, help="Okunamayan kare oranı.")
+    parser.add_argument("--seed", type=int, default=0, help="Rastgelelik tohumu.")
+    parser.add_argument("--force", action="store_true", help="Var olan dosyanın üzerine yaz.")
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    if args.output.exists() and not args.force:
+        raise SystemExit(f"{args.output} zaten var. Üzerine yazmak için --force kullanın.")
+    start = args.start if args.start is not None else pd.Timestamp.now().floor("s") - args.duration
+    info = generate(
+        args.output, start.to_pydatetime(), args.duration, args.rate,
+        args.multi_prob, args.glitch_prob, args.drop_prob, args.seed
+    )
+    print(f"{info['lines']} satır, {info['values']} değer, {info['bytes'] / 1e6:.1f} MB -> {info['path']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,13 +2,15 @@ import os
 import time
 import logging
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 from settings import (
     READINGS_TXT, MINUTE_AGG_CSV, HOUR_AGG_CSV,
-    LOG_FILE, PROCESSOR_PERIOD_SEC
+    LOG_FILE, PROCESSOR_PERIOD_SEC, PROCESSOR_CHUNKED, PROCESSOR_MEMORY_LIMIT_MB
 )
 
 # ---------- Logging ----------
@@ -63,12 +65,58 @@ def load_readings(limit_minutes: int | None = None) -> pd.DataFrame:
     df = pd.DataFrame(rows, columns=["ts", "value"])
     if df.empty:
         return df
-    df = df.sort_values("ts")
+    # Stabil sıralama: aynı zaman damgalı değerler dosya sırasını korur (parçalı modla aynı sonuç)
+    df = df.sort_values("ts", kind="stable")
     if limit_minutes:
         cutoff = pd.Timestamp.utcnow().tz_localize(None) - pd.Timedelta(minutes=limit_minutes)
         df = df[df["ts"] >= cutoff]
     return df
 
+def parse_lines(lines) -> tuple[np.ndarray, np.ndarray]:
+    """
+    readings.txt satırları -> (ts: int64 ns, value: float64) dizileri.
+    load_readings ile aynı kurallar; zaman damgaları toplu olarak parse edilir.
+    """
+    ts_strs: list[str] = []
+    counts: list[int] = []
+    values: list[float] = []
+    for raw in lines:
+        line = raw.strip()
+        if not line or "\t" not in line:
+            continue
+        ts_str, values_str = line.split("\t", 1)
+        n = 0
+        for p in values_str.split(","):
+            p = p.strip()
+            if not p:
+                continue
+            try:
+                values.append(float(p))
+                n += 1
+            except ValueError:
+                pass
+        if n:
+            ts_strs.append(ts_str)
+            counts.append(n)
+    if not ts_strs:
+        return np.empty(0, dtype="int64"), np.empty(0, dtype="float64")
+
+    try:
+        ts = pd.to_datetime(pd.Series(ts_strs), format="ISO8601", errors="coerce")
+    except (ValueError, TypeError):
+        ts = pd.Series(pd.NaT, index=range(len(ts_strs)), dtype="datetime64[ns]")
+    bad = ts.isna()
+    if bad.any():
+        # ISO dışı biçimler için satır bazında (load_readings gibi) dene
+        for i in np.flatnonzero(bad.to_numpy()):
+            try:
+                ts.iloc[i] = pd.to_datetime(ts_strs[i])
+            except Exception:
+                log.debug("Zaman parse atlandı: %s", ts_strs[i])
+    ts_ns = ts.astype("datetime64[ns]").to_numpy().view("int64")
+    keep = np.repeat(ts.notna().to_numpy(), counts)
+    return np.repeat(ts_ns, counts)[keep], np.asarray(values, dtype="float64")[keep]
+
 def aggregate_and_write(df: pd.DataFrame):
     # Boşsa başlık dosyalarını hazırla
     if df.empty:
@@ -77,23 +125,239 @@ def aggregate_and_write(df: pd.DataFrame):
                 safe_write_csv(pd.DataFrame(columns=["bucket_start","cnt","avg","min","max"]), path)
         return
 
-    # dakika
-    m = df.copy()
-    m["bucket_start"] = m["ts"].dt.floor("min")
-    g = m.groupby("bucket_start")["value"].agg(["count", "mean", "min", "max"]).reset_index()
+    safe_write_csv(summarize(df, "min"), MINUTE_AGG_CSV)  # dakika
+    safe_write_csv(summarize(df, "h"), HOUR_AGG_CSV)      # saat
+
+def summarize(df: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """ts/value -> bucket_start, cnt, avg, min, max (freq kovalarına göre)."""
+    bucket = df["ts"].dt.floor(freq).rename("bucket_start")
+    g = df.groupby(bucket)["value"].agg(["count", "mean", "min", "max"]).reset_index()
     g.rename(columns={"count": "cnt", "mean": "avg"}, inplace=True)
-    safe_write_csv(g, MINUTE_AGG_CSV)
+    return g
+
+# ---------- Bellek sınırlı (parçalı) toplulaştırma ----------
+CHUNK_ROW_BYTES = 400     # satır başına tahmini tepe bellek (parse + sıralama + groupby geçicileri)
+MIN_CHUNK_ROWS = 10_000
+HOUR_NS = 3_600_000_000_000
+
+def _merge_partials(parts: list[pd.DataFrame]) -> pd.DataFrame:
+    """Parça özetlerini birleştir; birden fazla parçada görünen kovalar ağırlıklı olarak birleşir."""
+    if not parts:
+        return pd.DataFrame(columns=["bucket_start","cnt","avg","min","max"])
+    df = pd.concat(parts, ignore_index=True)
+    dup = df["bucket_start"].duplicated(keep=False)
+    if dup.any():
+        d = df[dup].assign(total=df["avg"] * df["cnt"])
+        merged = d.groupby("bucket_start").agg(
+            cnt=("cnt", "sum"), total=("total", "sum"), min=("min", "min"), max=("max", "max")
+        ).reset_index()
+        merged["avg"] = merged["total"] / merged["cnt"]
+        df = pd.concat([df[~dup], merged[["bucket_start","cnt","avg","min","max"]]], ignore_index=True)
+    return df.sort_values("bucket_start", ignore_index=True)
+
+def _hour_summary(key: int, values: list[np.ndarray]) -> pd.DataFrame:
+    """Blok sınırlarını aşan saat kovası: biriken değerler tek seferde (aynı sırayla) özetlenir."""
+    v = np.concatenate(values)
+    ts = np.full(v.size, key * HOUR_NS, dtype="int64").view("datetime64[ns]")
+    return summarize(pd.DataFrame({"ts": ts, "value": v}), "h")
+
+def aggregate_chunked(path: Path, memory_limit_mb: float) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    readings.txt'yi sabit boyutlu bloklar halinde okuyup dakika/saat özetlerini üretir.
+    Son (yarım kalmış olabilecek) saat kovası bir sonraki bloğa taşınır. Saat bloğa sığmıyorsa
+    son dakika sınırından kesilir; açık saatin yalnızca değerleri (8 bayt/değer) saklanır ve saat
+    bitince aynı sırayla özetlenir. Böylece sıralı dosyada sonuç aggregate_and_write ile aynıdır.
+    Sıra dışı satırlar, tek başına bloğun yarısını aşan bir dakika veya bellek tavanının dörtte
+    birini aşan bir saat nedeniyle bölünen kovalar sonda ağırlıklı olarak birleştirilir.
+    """
+    parts: dict[str, list[pd.DataFrame]] = {"min": [], "h": []}
+    if not path.exists():
+        return _merge_partials([]), _merge_partials([])
+
+    limit = int(memory_limit_mb * 1024 * 1024)
+    out_bytes = 0
+    carry_ts = np.empty(0, dtype="int64")
+    carry_v = np.empty(0, dtype="float64")
+    open_hour: int | None = None         # dakikaları yazılmış, saati henüz bitmemiş kova
+    open_vals: list[np.ndarray] = []
+    open_bytes = 0
+    warned = False
+
+    def add_part(freq: str, g: pd.DataFrame):
+        nonlocal out_bytes
+        if not g.empty:
+            parts[freq].append(g)
+            out_bytes += int(g.memory_usage(index=False).sum())
+
+    def close_hour():
+        nonlocal open_vals, open_bytes
+        if open_vals:
+            add_part("h", _hour_summary(open_hour, open_vals))
+        open_vals, open_bytes = [], 0
+
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        while True:
+            # Tamamlanan özetler ve açık saat de tavana dahil; blok boyutu kalan bütçeye göre küçülür
+            block_rows = (limit - out_bytes - open_bytes) // CHUNK_ROW_BYTES
+            if block_rows < MIN_CHUNK_ROWS and not warned:
+                log.warning("Bellek tavanı (%s MB) özet çıktısı için dar; blok %d satıra sabitlendi.",
+                            memory_limit_mb, MIN_CHUNK_ROWS)
+                warned = True
+            block_rows = max(MIN_CHUNK_ROWS, block_rows)
+            lines = list(islice(f, block_rows))
+            eof = len(lines) < block_rows
+            ts, values = parse_lines(lines)
+            del lines
+
+            df = pd.DataFrame({
+                "ts": np.concatenate([carry_ts, ts]).view("datetime64[ns]"),
+                "value": np.concatenate([carry_v, values]),
+            }).sort_values("ts", kind="stable", ignore_index=True)
+            del ts, values
+            ts_ns = df["ts"].to_numpy().view("int64")
+            hours = ts_ns // HOUR_NS
+            cut = len(df)
+            if not eof and cut:
+                # Son saat kovası henüz bitmemiş olabilir -> sonraki bloğa taşı
+                cut = int(np.searchsorted(hours, hours[-1], side="left"))
+                if len(df) - cut > block_rows // 2:
+                    # Saat bloğa sığmıyor: son dakikadan kes (dakikalar tam kalır, saat açık kalır)
+                    minutes = ts_ns // AGG_FREQ_NS["minute"]
+                    cut = int(np.searchsorted(minutes, minutes[-1], side="left"))
+                    if len(df) - cut > block_rows // 2:
+                        cut = len(df)  # tek dakika bütçeyi aşıyor; kısmi olarak yaz, sonda birleşir
+            carry_ts = ts_ns[cut:].copy()
+            carry_v = df["value"].to_numpy()[cut:].copy()
+            done = df.iloc[:cut]
+            if cut:
+                add_part("min", summarize(done, "min"))
+
+            # Saat özetleri: açık saate ait satırlar biriktirilir, geri kalanı doğrudan özetlenir
+            d_hours = hours[:cut]
+            rest = done
+            if open_hour is not None:
+                lo = int(np.searchsorted(d_hours, open_hour, side="left"))
+                hi = int(np.searchsorted(d_hours, open_hour, side="right"))
+                if lo:
+                    add_part("h", summarize(done.iloc[:lo], "h"))  # geç gelen (eski saat) satırlar
+                if hi > lo:
+                    chunk = done["value"].to_numpy()[lo:hi].copy()
+                    open_vals.append(chunk)
+                    open_bytes += chunk.nbytes
+                rest, d_hours = done.iloc[hi:], d_hours[hi:]
+                if eof or (len(df) and hours[-1] > open_hour):
+                    close_hour()
+                    open_hour = None
+                elif open_bytes > limit // 4:
+                    close_hour()  # tek saat bütçeyi aşıyor; kısmi olarak yaz, sonda birleşir
+            if len(rest):
+                end = len(rest)
+                # Kesimden sonra aynı saat sürüyorsa (veya bilinmiyorsa) son saat açık kalır
+                if not eof and (carry_ts.size == 0 or carry_ts[0] // HOUR_NS == d_hours[-1]):
+                    end = int(np.searchsorted(d_hours, d_hours[-1], side="left"))
+                if end:
+                    add_part("h", summarize(rest.iloc[:end], "h"))
+                if end < len(rest):
+                    close_hour()
+                    open_hour = int(d_hours[-1])
+                    open_vals = [rest["value"].to_numpy()[end:].copy()]
+                    open_bytes = open_vals[0].nbytes
+            del df, done, rest
+            if eof:
+                break
+    close_hour()
+
+    return _merge_partials(parts["min"]), _merge_partials(parts["h"])
+
+def aggregate_chunked_and_write():
+    minute, hour = aggregate_chunked(READINGS_TXT, PROCESSOR_MEMORY_LIMIT_MB)
+    if minute.empty:
+        aggregate_and_write(pd.DataFrame(columns=["ts", "value"]))
+        return
+    safe_write_csv(minute, MINUTE_AGG_CSV)
+    safe_write_csv(hour, HOUR_AGG_CSV)
+
+# ---------- Artımlı toplulaştırma ----------
+AGG_COLUMNS = ["bucket_start", "cnt", "avg", "min", "max"]
+AGG_FREQS = {"minute": "min", "hour": "h"}
+AGG_FREQ_NS = {"minute": 60_000_000_000, "hour": HOUR_NS}
+
+class IncrementalAggregator:
+    """
+    Dakika/saat kovalarını bellekte tutar ve her yeni değerle günceller.
+    Kova başına (cnt, sum, min, max) saklanır; CSV çıktısı aggregate_and_write ile aynı kolonlara sahiptir.
+    Anahtarlar int64 ns kova başlangıcıdır. Değerler değiştirilemez tuple olduğundan copy() ile
+    alınan sığ kopya, başka bir thread'de güvenle okunabilir.
+    """
+
+    def __init__(self):
+        self.buckets: dict[str, dict[int, tuple]] = {name: {} for name in AGG_FREQS}
+        # Kovalar kronolojik eklendiyse dict sırası = zaman sırası (son kovalar sondan okunur)
+        self.in_order: dict[str, bool] = {name: True for name in AGG_FREQS}
+
+    def _put(self, name: str, key: int, cnt: int, total: float, vmin: float, vmax: float):
+        store = self.buckets[name]
+        stats = store.get(key)
+        if stats is None:
+            if store and key < next(reversed(store)):
+                self.in_order[name] = False
+            store[key] = (cnt, total, vmin, vmax)
+        else:
+            store[key] = (stats[0] + cnt, stats[1] + total, min(stats[2], vmin), max(stats[3], vmax))
+
+    def add_frame(self, df: pd.DataFrame):
+        """Okumaları (load_readings formatı) toplu olarak ekle; mevcut kovalarla birleştirilir."""
+        if df.empty:
+            return
+        for name, freq in AGG_FREQS.items():
+            g = df.groupby(df["ts"].dt.floor(freq))["value"].agg(["count", "sum", "min", "max"])
+            for key, row in zip(g.index.asi8, g.itertuples(index=False)):
+                self._put(name, int(key), int(row[0]), float(row[1]), float(row[2]), float(row[3]))
+
+    def add(self, ts: pd.Timestamp, value: float):
+        for name, step in AGG_FREQ_NS.items():
+            self._put(name, ts.value - ts.value % step, 1, value, value, value)
+
+    def copy(self) -> "IncrementalAggregator":
+        """Sığ kopya (dict kopyası; C seviyesinde hızlı)."""
+        other = IncrementalAggregator()
+        other.buckets = {name: dict(store) for name, store in self.buckets.items()}
+        other.in_order = dict(self.in_order)
+        return other
 
-    # saat
-    h = df.copy()
-    h["bucket_start"] = h["ts"].dt.floor("H")
-    gh = h.groupby("bucket_start")["value"].agg(["count", "mean", "min", "max"]).reset_index()
-    gh.rename(columns={"count": "cnt", "mean": "avg"}, inplace=True)
-    safe_write_csv(gh, HOUR_AGG_CSV)
+    def frame(self, name: str, since: pd.Timestamp | None = None) -> pd.DataFrame:
+        """Kovaları sıralı DataFrame olarak döndür; since verilirse yalnızca bucket_start >= since."""
+        store = self.buckets[name]
+        if since is not None and self.in_order[name]:
+            lo = since.value
+            items = []
+            for key in reversed(store):
+                if key < lo:
+                    break
+                items.append((key, store[key]))
+            items.reverse()
+        else:
+            items = list(store.items()) if self.in_order[name] else sorted(store.items())
+            if since is not None:
+                items = [it for it in items if it[0] >= since.value]
+        if not items:
+            return pd.DataFrame(columns=AGG_COLUMNS)
+        keys = np.fromiter((k for k, _ in items), dtype="int64", count=len(items))
+        stats = np.array([v for _, v in items], dtype="float64")
+        return pd.DataFrame({
+            "bucket_start": keys.view("datetime64[ns]"),
+            "cnt": stats[:, 0].astype("int64"),
+            "avg": stats[:, 1] / stats[:, 0],
+            "min": stats[:, 2],
+            "max": stats[:, 3],
+        })
 
 def run_once():
-    df = load_readings()
-    aggregate_and_write(df)
+    if PROCESSOR_CHUNKED:
+        aggregate_chunked_and_write()
+    else:
+        df = load_readings()
+        aggregate_and_write(df)
     log.info("Aggregates updated → %s , %s", MINUTE_AGG_CSV.name, HOUR_AGG_CSV.name)
 
 def run_forever(period_sec: int):
@@ -0,0 +1,448 @@
+"""
+Okumalar ve özetler için yerel HTTP sorgu servisi.
+
+readings.txt yalnızca yeni eklenen kısmı okunarak bellek içi indekse işlenir
+(ham değerler + dakika/saat kovaları); her istekte dosya baştan parse edilmez.
+
+Uç noktalar (tümü GET, yanıtlar JSON; ?format=arrow ile Arrow IPC stream):
+  /readings?start=ISO&end=ISO&limit=N        ham değerler, [start, end)
+  /aggregates?resolution=minute|hour|5min    kova özetleri (cnt, avg, min, max)
+  /latest                                    son değer + son dakika/saat kovası
+Yanıtlar ETag / Last-Modified taşır; If-None-Match / If-Modified-Since ile 304 döner.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from settings import READINGS_TXT, QUERY_API_HOST, QUERY_API_PORT
+from proccessor_txt import AGG_COLUMNS, AGG_FREQS, AGG_FREQ_NS, parse_lines
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow çıktısı opsiyonel
+    pa = None
+
+log = logging.getLogger("query_api")
+
+READ_BLOCK_BYTES = 16 * 1024 * 1024
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+
+
+class QueryError(ValueError):
+    """İstemci hatası; 400 olarak döner."""
+
+
+class _Rollup:
+    """
+    Tek çözünürlük için kova dizileri (bucket_start ns, cnt, sum, min, max), bucket_start'a göre sıralı.
+    Kronolojik eklemede yalnızca son kova güncellenir ve yeni kovalar sona eklenir; geçmiş
+    yeniden hesaplanmaz. Geç gelen (eski) veri nadirdir ve tam birleştirme ile işlenir.
+    """
+
+    def __init__(self, step_ns: int):
+        self.step = step_ns
+        self.n = 0
+        self.keys = np.empty(256, dtype="int64")
+        self.cnt = np.empty(256, dtype="int64")
+        self.total = np.empty(256, dtype="float64")
+        self.vmin = np.empty(256, dtype="float64")
+        self.vmax = np.empty(256, dtype="float64")
+
+    @staticmethod
+    def _group(keys: np.ndarray, cnt, total, vmin, vmax):
+        ukeys, inv = np.unique(keys, return_inverse=True)
+        m = ukeys.size
+        g_min = np.full(m, np.inf)
+        g_max = np.full(m, -np.inf)
+        np.minimum.at(g_min, inv, vmin)
+        np.maximum.at(g_max, inv, vmax)
+        return (ukeys, np.bincount(inv, weights=cnt, minlength=m).astype("int64"),
+                np.bincount(inv, weights=total, minlength=m), g_min, g_max)
+
+    def add(self, ts: np.ndarray, values: np.ndarray):
+        ok = ~np.isnan(values)
+        ts, values = ts[ok], values[ok]
+        if not ts.size:
+            return
+        new = self._group(ts - ts % self.step, np.ones(ts.size), values, values, values)
+        if self.n and new[0][0] < self.keys[self.n - 1]:
+            # Son kovadan eski veri: mevcut kovalarla birlikte yeniden grupla
+            cols = self.columns()
+            merged = self._group(*(np.concatenate([a, b]) for a, b in zip(cols, new)))
+            self.n = 0
+            self._append(*merged)
+            return
+        if self.n and new[0][0] == self.keys[self.n - 1]:
+            i = self.n - 1
+            self.cnt[i] += new[1][0]
+            self.total[i] += new[2][0]
+            self.vmin[i] = min(self.vmin[i], new[3][0])
+            self.vmax[i] = max(self.vmax[i], new[4][0])
+            new = tuple(a[1:] for a in new)
+        self._append(*new)
+
+    def _append(self, keys, cnt, total, vmin, vmax):
+        k = keys.size
+        if self.n + k > self.keys.size:
+            cap = max(2 * self.keys.size, self.n + k)
+            for name in ("keys", "cnt", "total", "vmin", "vmax"):
+                setattr(self, name, np.resize(getattr(self, name), cap))
+        sl = slice(self.n, self.n + k)
+        self.keys[sl], self.cnt[sl], self.total[sl], self.vmin[sl], self.vmax[sl] = keys, cnt, total, vmin, vmax
+        self.n += k
+
+    def columns(self, lo: int = 0, hi: int | None = None) -> tuple[np.ndarray, ...]:
+        hi = self.n if hi is None else hi
+        return (self.keys[lo:hi], self.cnt[lo:hi], self.total[lo:hi], self.vmin[lo:hi], self.vmax[lo:hi])
+
+    def frame(self, start: pd.Timestamp | None, end: pd.Timestamp | None) -> pd.DataFrame:
+        """bucket_start, [start'ın kovası, end) aralığındaki kovalar."""
+        keys = self.keys[:self.n]
+        lo = 0 if start is None else int(np.searchsorted(keys, start.value - start.value % self.step))
+        hi = self.n if end is None else int(np.searchsorted(keys, end.value, side="left"))
+        keys, cnt, total, vmin, vmax = self.columns(lo, max(lo, hi))
+        return pd.DataFrame({
+            "bucket_start": keys.view("datetime64[ns]"),
+            "cnt": cnt, "avg": total / cnt, "min": vmin, "max": vmax,
+        })
+
+    def last(self) -> dict | None:
+        if not self.n:
+            return None
+        i = self.n - 1
+        return {
+            "bucket_start": pd.Timestamp(self.keys[i]).isoformat(),
+            "cnt": int(self.cnt[i]), "avg": float(self.total[i] / self.cnt[i]),
+            "min": float(self.vmin[i]), "max": float(self.vmax[i]),
+        }
+
+
+def _parse_resolution(text: str) -> pd.offsets.Tick:
+    """
+    resolution parametresi -> pozitif, sabit süreli pandas offset'i.
+
+    >>> _parse_resolution("15min")
+    <15 * Minutes>
+    >>> for bad in ("0min", "-5min", "1M", "abc"):
+    ...     try:
+    ...         _parse_resolution(bad)
+    ...     except QueryError:
+    ...         print(bad, "reddedildi")
+    0min reddedildi
+    -5min reddedildi
+    1M reddedildi
+    abc reddedildi
+    """
+    try:
+        offset = pd.tseries.frequencies.to_offset(text)
+    except ValueError as e:
+        raise QueryError(f"Geçersiz resolution: {text}") from e
+    if not isinstance(offset, pd.offsets.Tick):
+        raise QueryError("resolution sabit süreli olmalı (ör. 5min, 15min, 6h, 1D).")
+    if offset.nanos <= 0:
+        raise QueryError(f"resolution pozitif olmalı: {text}")
+    return offset
+
+
+class ReadingsIndex:
+    """readings.txt'nin bellek içi, artımlı güncellenen kopyası."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.generation = 0
+        self._reset()
+
+    def _reset(self):
+        self.generation += 1
+        self.offset = 0
+        self.inode: int | None = None
+        self.n = 0
+        self._ts = np.empty(1024, dtype="int64")
+        self._values = np.empty(1024, dtype="float64")
+        self.is_sorted = True
+        self.rollups = {name: _Rollup(AGG_FREQ_NS[name]) for name in AGG_FREQS}
+        self.last_modified = 0.0
+
+    @property
+    def version(self) -> str:
+        return f"{self.generation}-{self.n}"
+
+    # ---------- Güncelleme ----------
+    def refresh(self):
+        """Dosyada son okumadan beri eklenen tam satırları indekse ekle."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            if self.n:
+                self._reset()
+            return
+        if self.inode is not None and (st.st_ino != self.inode or st.st_size < self.offset):
+            log.info("readings.txt değişti (yeniden oluşturulmuş/kısalmış), indeks sıfırlanıyor.")
+            self._reset()
+        self.inode = st.st_ino
+        if st.st_size == self.offset:
+            return
+
+        before = self.n
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            pending = b""
+            while True:
+                block = f.read(READ_BLOCK_BYTES)
+                if not block:
+                    break
+                data = pending + block
+                end = data.rfind(b"\n")
+                if end < 0:
+                    pending = data
+                    continue
+                # Yarım kalan son satır bir sonraki okumaya bırakılır
+                pending = data[end + 1:]
+                self.offset += end + 1
+                self._ingest(data[:end + 1].decode("utf-8", errors="ignore").splitlines())
+        if self.n != before:
+            self.last_modified = st.st_mtime
+
+    def _ingest(self, lines: list[str]):
+        ts, values = parse_lines(lines)
+        k = ts.size
+        if not k:
+            return
+        if self.n + k > self._ts.size:
+            cap = max(2 * self._ts.size, self.n + k)
+            self._ts = np.resize(self._ts, cap)
+            self._values = np.resize(self._values, cap)
+        if (self.n and ts[0] < self._ts[self.n - 1]) or np.any(np.diff(ts) < 0):
+            self.is_sorted = False
+        self._ts[self.n:self.n + k] = ts
+        self._values[self.n:self.n + k] = values
+        self.n += k
+        for rollup in self.rollups.values():
+            rollup.add(ts, values)
+
+    def _ensure_sorted(self):
+        if self.is_sorted:
+            return
+        order = np.argsort(self._ts[:self.n], kind="stable")
+        self._ts[:self.n] = self._ts[:self.n][order]
+        self._values[:self.n] = self._values[:self.n][order]
+        self.is_sorted = True
+
+    # ---------- Sorgular ----------
+    def _slice(self, start: pd.Timestamp | None, end: pd.Timestamp | None) -> tuple[np.ndarray, np.ndarray]:
+        self._ensure_sorted()
+        ts = self._ts[:self.n]
+        lo = 0 if start is None else int(np.searchsorted(ts, start.value, side="left"))
+        hi = self.n if end is None else int(np.searchsorted(ts, end.value, side="left"))
+        return ts[lo:hi], self._values[lo:hi]
+
+    def readings(self, start, end, limit: int | None) -> pd.DataFrame:
+        ts, values = self._slice(start, end)
+        if limit is not None:
+            lo = max(0, ts.size - limit)  # aralıktaki en yeni N değer
+            ts, values = ts[lo:], values[lo:]
+        return pd.DataFrame({"ts": ts.view("datetime64[ns]"), "value": values})
+
+    def aggregates(self, resolution: str, start, end) -> pd.DataFrame:
+        if resolution in self.rollups:
+            return self.rollups[resolution].frame(start, end)
+
+        # Diğer çözünürlükler ham indeksten hesaplanır
+        offset = _parse_resolution(resolution)
+        df = self.readings(None if start is None else start.floor(offset), end, None)
+        if df.empty:
+            return pd.DataFrame(columns=AGG_COLUMNS)
+        g = df.groupby(df["ts"].dt.floor(offset))["value"].agg(["count", "mean", "min", "max"])
+        g = g.reset_index().rename(columns={"ts": "bucket_start", "count": "cnt", "mean": "avg"})
+        return g
+
+    def latest(self) -> dict:
+        out: dict = {"reading": None}
+        if self.n:
+            self._ensure_sorted()
+            out["reading"] = {
+                "ts": pd.Timestamp(self._ts[self.n - 1]).isoformat(),
+                "value": float(self._values[self.n - 1]),
+            }
+        for name, rollup in self.rollups.items():
+            out[name] = rollup.last()
+        return out
+
+
+# ---------- HTTP ----------
+def _param_ts(params: dict, key: str) -> pd.Timestamp | None:
+    if key not in params:
+        return None
+    try:
+        ts = pd.Timestamp(params[key][0])
+    except ValueError as e:
+        raise QueryError(f"Geçersiz zaman ({key}): {params[key][0]}") from e
+    if ts is pd.NaT:
+        raise QueryError(f"Geçersiz zaman ({key}): boş")
+    if ts.tzinfo:
+        # readings.txt yerel saatle yazılır
+        ts = ts.tz_convert(datetime.now().astimezone().tzinfo).tz_localize(None)
+    return ts
+
+
+def _records(df: pd.DataFrame) -> list[dict]:
+    """DataFrame -> JSON kayıtları; değerler tam hassasiyetle (float repr), zamanlar saniye ISO."""
+    cols = {}
+    for name in df.columns:
+        col = df[name]
+        if pd.api.types.is_datetime64_any_dtype(col):
+            cols[name] = np.datetime_as_string(col.to_numpy(), unit="s").tolist()
+        else:
+            cols[name] = col.tolist()
+    return [dict(zip(cols, row)) for row in zip(*cols.values())]
+
+
+def _to_arrow(df: pd.DataFrame) -> bytes:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    index: ReadingsIndex  # serve() tarafından atanır
+
+    def log_message(self, format, *args):
+        log.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        wants_arrow = (
+            params.get("format", [""])[0] == "arrow"
+            or ARROW_MIME in self.headers.get("Accept", "")
+        )
+        if wants_arrow and pa is None:
+            self._send_error(406, "Arrow çıktısı için: pip install pyarrow")
+            return
+        try:
+            with self.index.lock:
+                self.index.refresh()
+                etag = '"' + hashlib.sha1(
+                    f"{self.index.version}|{self.path}|{wants_arrow}".encode("utf-8")
+                ).hexdigest()[:20] + '"'
+                last_modified = int(self.index.last_modified)
+                if self._not_modified(etag, last_modified):
+                    self._send(304, b"", None, etag, last_modified)
+                    return
+                payload = self._query(url.path, params)
+        except QueryError as e:
+            self._send_error(400, str(e))
+            return
+        except Exception:
+            log.exception("Sorgu hatası: %s", self.path)
+            self._send_error(500, "Sunucu hatası")
+            return
+
+        if payload is None:
+            self._send_error(404, f"Bilinmeyen uç nokta: {url.path}")
+        elif isinstance(payload, dict):
+            self._send(200, json.dumps(payload).encode("utf-8"), "application/json", etag, last_modified)
+        elif wants_arrow:
+            self._send(200, _to_arrow(payload), ARROW_MIME, etag, last_modified)
+        else:
+            body = json.dumps(_records(payload)).encode("utf-8")
+            self._send(200, body, "application/json", etag, last_modified)
+
+    def _query(self, path: str, params: dict) -> pd.DataFrame | dict | None:
+        start, end = _param_ts(params, "start"), _param_ts(params, "end")
+        if path == "/readings":
+            limit = None
+            if "limit" in params:
+                try:
+                    limit = max(0, int(params["limit"][0]))
+                except ValueError as e:
+                    raise QueryError("limit tam sayı olmalı.") from e
+            return self.index.readings(start, end, limit)
+        if path == "/aggregates":
+            resolution = params.get("resolution", ["minute"])[0]
+            return self.index.aggregates(resolution, start, end)
+        if path == "/latest":
+            return self.index.latest()
+        return None
+
+    def _not_modified(self, etag: str, last_modified: int) -> bool:
+        inm = self.headers.get("If-None-Match")
+        if inm is not None:
+            return etag in [t.strip() for t in inm.split(",")] or inm.strip() == "*"
+        ims = self.headers.get("If-Modified-Since")
+        if ims is None or not last_modified:
+            return False
+        try:
+            return last_modified <= int(parsedate_to_datetime(ims).timestamp())
+        except (TypeError, ValueError):
+            return False
+
+    def _send(self, code: int, body: bytes, ctype: str | None, etag: str, last_modified: int):
+        self.send_response(code)
+        if ctype:
+            self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        if last_modified:
+            self.send_header("Last-Modified", formatdate(last_modified, usegmt=True))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _send_error(self, code: int, message: str):
+        body = json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(host: str, port: int, path: Path = READINGS_TXT):
+    index = ReadingsIndex(path)
+    with index.lock:
+        index.refresh()
+    log.info("İndeks hazır: %d değer (%s)", index.n, path)
+    handler = type("BoundQueryHandler", (QueryHandler,), {"index": index})
+    server = ThreadingHTTPServer((host, port), handler)
+    log.info("Sorgu API dinliyor: http://%s:%s", host, port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log.info("Kullanıcı durdurdu (Ctrl+C).")
+    finally:
+        server.server_close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Okumalar ve özetler için yerel HTTP sorgu servisi."
+    )
+    parser.add_argument("--host", default=QUERY_API_HOST, help=f"Dinlenecek adres (varsayılan: {QUERY_API_HOST}).")
+    parser.add_argument("--port", type=int, default=QUERY_API_PORT, help=f"Port (varsayılan: {QUERY_API_PORT}).")
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    serve(args.host, args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,314 @@
+"""
+Tek süreçli asyncio çalışma zamanı: collector + processor + yerel yayıncı.
+
+Kamera okuma ve OCR executor'larda çalışır; örnekler bellek içi kuyruklarla
+toplulaştırıcıya ve yayıncıya aktarılır. Disk yalnızca kalıcı kopyadır
+(readings.txt + periyodik özet CSV'leri). Dashboard verileri yayıncıdan okur.
+
+Yayıncı protokolü (TCP, satır başına bir JSON):
+  -> {"op": "snapshot", "minutes": 30, "agg_minutes": 1440}
+                                          son N dakika ham veri + son M dakikanın özetleri, bağlantı kapanır
+  -> {"op": "subscribe"}                  yeni örnekler geldikçe akıtılır
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from settings import (
+    READINGS_TXT, MINUTE_AGG_CSV, HOUR_AGG_CSV, SAMPLE_PERIOD_SEC, CAMERA_INDEX_CANDIDATES,
+    DASH_LIVE_WINDOW_MIN, DASH_AGG_WINDOW_MIN, RUNTIME_ROI, RUNTIME_PUBLISH_HOST, RUNTIME_PUBLISH_PORT,
+    RUNTIME_AGG_FLUSH_SEC, RUNTIME_RECENT_WINDOW_MIN
+)
+from collector import (
+    ensure_tesseract_path, open_camera, preprocess_for_digits,
+    ocr_text, extract_floats, append_to_txt
+)
+from proccessor_txt import IncrementalAggregator, load_readings, safe_write_csv
+
+log = logging.getLogger("runtime")
+
+QUEUE_SIZE = 1024
+# Abone başına bekleyen mesaj sınırı ve yazma zaman aşımı; aşan (okumayan) abone bağlantısı kesilir
+SUBSCRIBER_QUEUE_SIZE = 256
+SUBSCRIBER_DRAIN_TIMEOUT_SEC = 5.0
+# OCR örnek periyodunu aşsa bile tampondaki eski kareleri atmak için en az bu kadar kare çekilir (saniye)
+MIN_GRAB_SEC = 0.1
+
+
+def _ocr_roi(frame, roi: tuple[int, int, int, int]) -> list[float]:
+    x, y, w, h = roi
+    return extract_floats(ocr_text(preprocess_for_digits(frame[y:y+h, x:x+w])))
+
+
+def _grab_until(cap, deadline: float) -> bool:
+    """deadline'a (monotonic) kadar kare çek; son çekimin başarısını döndürür."""
+    deadline = max(deadline, time.monotonic() + MIN_GRAB_SEC)
+    ok = cap.grab()
+    while ok and time.monotonic() < deadline:
+        ok = cap.grab()
+    return ok
+
+
+def _agg_rows(df: pd.DataFrame) -> list[dict]:
+    return [
+        {"bucket_start": r.bucket_start.isoformat(), "cnt": int(r.cnt),
+         "avg": float(r.avg), "min": float(r.min), "max": float(r.max)}
+        for r in df.itertuples(index=False)
+    ]
+
+
+def _encode(msg: dict) -> bytes:
+    return (json.dumps(msg, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _encode_snapshot(readings: list, minute: pd.DataFrame, hour: pd.DataFrame) -> bytes:
+    return _encode({
+        "type": "snapshot",
+        "readings": [[ts.isoformat(), v] for ts, v in readings],
+        "minute": _agg_rows(minute),
+        "hour": _agg_rows(hour),
+    })
+
+
+def _write_aggregates(aggregator: IncrementalAggregator):
+    safe_write_csv(aggregator.frame("minute"), MINUTE_AGG_CSV)
+    safe_write_csv(aggregator.frame("hour"), HOUR_AGG_CSV)
+
+
+class Runtime:
+    def __init__(self, roi: tuple[int, int, int, int]):
+        self.roi = roi
+        self.aggregator = IncrementalAggregator()
+        self.recent: deque[tuple[pd.Timestamp, float]] = deque()
+        self.agg_q: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+        self.pub_q: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+        self.subscribers: dict[asyncio.StreamWriter, asyncio.Queue] = {}
+        # Disk için tek iş parçacığı (sıra korunur); kamera ve OCR için ayrı havuzlar
+        self.io_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rt-io")
+        self.cam_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rt-cam")
+        self.ocr_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rt-ocr")
+
+    # ---------- Başlangıç ----------
+    def seed(self):
+        df = load_readings()
+        self.aggregator.add_frame(df)
+        cutoff = pd.Timestamp.now() - pd.Timedelta(minutes=RUNTIME_RECENT_WINDOW_MIN)
+        if not df.empty:
+            df = df[df["ts"] >= cutoff]
+            self.recent.extend(zip(df["ts"], df["value"].astype(float)))
+        log.info("Başlangıç durumu yüklendi: %d ham değer (pencere)", len(self.recent))
+
+    # ---------- Üretici ----------
+    async def capture(self, cap):
+        loop = asyncio.get_running_loop()
+        next_time = time.monotonic()
+        while True:
+            # Örnek anına kadar kareler sürekli çekilir (sürücü tamponu bayat kare biriktirmez),
+            # yalnızca son kare çözülür
+            ok = await loop.run_in_executor(self.cam_pool, _grab_until, cap, next_time)
+            if ok:
+                ok, frame = await loop.run_in_executor(self.cam_pool, cap.retrieve)
+            next_time = max(next_time + SAMPLE_PERIOD_SEC, time.monotonic())
+            if not ok:
+                log.warning("Kare alınamadı. 100ms bekle.")
+                await asyncio.sleep(0.1)
+                continue
+            ts = datetime.now().replace(microsecond=0)
+            try:
+                vals = await loop.run_in_executor(self.ocr_pool, _ocr_roi, frame, self.roi)
+            except Exception:
+                log.exception("OCR döngüsünde hata.")
+                vals = []
+            if vals:
+                # Kalıcı kopya önce yazılır, ardından bellek içi tüketicilere dağıtılır
+                await loop.run_in_executor(self.io_pool, append_to_txt, READINGS_TXT, vals, ts)
+                sample = (pd.Timestamp(ts), vals)
+                self.remember(*sample)
+                await self.agg_q.put(sample)
+                if self.pub_q.full():
+                    self.pub_q.get_nowait()  # yavaş yayında en eski örneği at
+                self.pub_q.put_nowait(sample)
+
+    def remember(self, ts: pd.Timestamp, vals: list[float]):
+        """Snapshot'ların ham veri penceresi; yayından bağımsız güncellenir (abone yavaşlığı etkilemez)."""
+        for v in vals:
+            self.recent.append((ts, v))
+        cutoff = ts - pd.Timedelta(minutes=RUNTIME_RECENT_WINDOW_MIN)
+        while self.recent and self.recent[0][0] < cutoff:
+            self.recent.popleft()
+
+    # ---------- Tüketiciler ----------
+    async def aggregate(self):
+        while True:
+            ts, vals = await self.agg_q.get()
+            for v in vals:
+                self.aggregator.add(ts, v)
+
+    async def flush_periodically(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(RUNTIME_AGG_FLUSH_SEC)
+            await self.flush(loop)
+
+    async def flush(self, loop):
+        # Olay döngüsünde yalnızca sığ kopya alınır (kova değerleri tuple, değişmez);
+        # DataFrame üretimi ve CSV biçimlendirme io executor'da yapılır
+        snap = self.aggregator.copy()
+        try:
+            await loop.run_in_executor(self.io_pool, _write_aggregates, snap)
+        except Exception:
+            log.exception("Özet CSV yazılamadı.")
+
+    async def publish(self):
+        # Hiç beklemez: her abonenin kendi sınırlı kuyruğu vardır, yazma işi abonenin görevindedir
+        while True:
+            ts, vals = await self.pub_q.get()
+            if not self.subscribers:
+                continue
+            data = _encode({"type": "sample", "ts": ts.isoformat(), "values": vals})
+            for w, q in list(self.subscribers.items()):
+                try:
+                    q.put_nowait(data)
+                except asyncio.QueueFull:
+                    log.warning("Abone okumuyor (%d mesaj birikti); bağlantı kesiliyor.", q.qsize())
+                    self.subscribers.pop(w, None)
+                    w.close()
+
+    # ---------- Yayıncı sunucusu ----------
+    async def snapshot(self, minutes: int, agg_minutes: int) -> bytes:
+        """
+        Olay döngüsünde yalnızca istenen pencereler kopyalanır (maliyet pencereyle orantılı,
+        geçmişle değil); JSON serileştirme OCR'ı bekletmemek için ayrı thread'de yapılır.
+        """
+        now = pd.Timestamp.now()
+        cutoff = now - pd.Timedelta(minutes=minutes)
+        readings = []
+        for item in reversed(self.recent):
+            if item[0] < cutoff:
+                break
+            readings.append(item)
+        readings.reverse()
+        agg_cutoff = now - pd.Timedelta(minutes=agg_minutes)
+        minute = self.aggregator.frame("minute", since=agg_cutoff.floor("min"))
+        hour = self.aggregator.frame("hour", since=agg_cutoff.floor("h"))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _encode_snapshot, readings, minute, hour)
+
+    async def serve_subscriber(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        q: asyncio.Queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers[writer] = q
+        closed = asyncio.create_task(reader.read())  # istemci (veya publish) kapatınca tamamlanır
+        try:
+            while True:
+                get = asyncio.create_task(q.get())
+                await asyncio.wait({get, closed}, return_when=asyncio.FIRST_COMPLETED)
+                if not get.done():
+                    get.cancel()
+                    return
+                writer.write(get.result())
+                await asyncio.wait_for(writer.drain(), SUBSCRIBER_DRAIN_TIMEOUT_SEC)
+        except asyncio.TimeoutError:
+            log.warning("Abone %.0f sn içinde okumadı; bağlantı kesiliyor.", SUBSCRIBER_DRAIN_TIMEOUT_SEC)
+        finally:
+            closed.cancel()
+            self.subscribers.pop(writer, None)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            raw = await asyncio.wait_for(reader.readline(), timeout=5)
+            req = json.loads(raw or b"{}")
+            if req.get("op") == "subscribe":
+                await self.serve_subscriber(reader, writer)
+                return
+            minutes = int(req.get("minutes", DASH_LIVE_WINDOW_MIN))
+            agg_minutes = int(req.get("agg_minutes", DASH_AGG_WINDOW_MIN))
+            writer.write(await self.snapshot(minutes, agg_minutes))
+            await writer.drain()
+        except (asyncio.TimeoutError, ValueError, ConnectionError):
+            log.debug("Geçersiz/yarım yayıncı isteği.")
+        finally:
+            self.subscribers.pop(writer, None)
+            writer.close()
+
+    # ---------- Ana akış ----------
+    async def run(self, cap):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.io_pool, self.seed)
+        server = await asyncio.start_server(
+            self.handle_client, RUNTIME_PUBLISH_HOST, RUNTIME_PUBLISH_PORT
+        )
+        log.info("Yayıncı dinliyor: %s:%s", RUNTIME_PUBLISH_HOST, RUNTIME_PUBLISH_PORT)
+        tasks = [
+            asyncio.create_task(self.capture(cap)),
+            asyncio.create_task(self.aggregate()),
+            asyncio.create_task(self.flush_periodically()),
+            asyncio.create_task(self.publish()),
+        ]
+        try:
+            async with server:
+                await asyncio.gather(*tasks)
+        finally:
+            for t in tasks:
+                t.cancel()
+            await self.flush(loop)
+
+
+def parse_roi(text: str) -> tuple[int, int, int, int]:
+    parts = [int(p) for p in text.split(",")]
+    if len(parts) != 4:
+        raise argparse.ArgumentTypeError("ROI formatı: x,y,w,h")
+    return tuple(parts)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Collector, processor ve yayıncıyı tek süreçte çalıştırır."
+    )
+    parser.add_argument(
+        "--roi",
+        type=parse_roi,
+        default=RUNTIME_ROI,
+        help="OCR bölgesi x,y,w,h (varsayılan: settings.RUNTIME_ROI)."
+    )
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    if args.roi is None:
+        raise SystemExit(
+            "ROI tanımlı değil. collector.py ile 'r' tuşuyla ROI seçip logdaki değeri "
+            "settings.RUNTIME_ROI'ye yazın veya --roi x,y,w,h verin."
+        )
+    ensure_tesseract_path()
+    READINGS_TXT.touch(exist_ok=True)
+
+    cap = open_camera(CAMERA_INDEX_CANDIDATES)
+    if cap is None:
+        raise SystemExit("Kamera açılamadı. Başka index deneyin (0/1/2) veya "
+                         "kamerayı kullanan uygulamayı kapatın.")
+
+    runtime = Runtime(args.roi)
+    log.info("Runtime başlıyor. ROI=%s, kayıt dosyası: %s", args.roi, READINGS_TXT)
+    try:
+        asyncio.run(runtime.run(cap))
+    except KeyboardInterrupt:
+        log.info("Kullanıcı durdurdu (Ctrl+C).")
+    finally:
+        cap.release()
+        runtime.io_pool.shutdown(wait=False)
+        runtime.cam_pool.shutdown(wait=False)
+        runtime.ocr_pool.shutdown(wait=False)
+        log.info("Runtime kapandı.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -24,8 +24,40 @@ SAMPLE_PERIOD_SEC = 1.0
 # Processor çalışma periyodu (saniye)
 PROCESSOR_PERIOD_SEC = 60
 
+# Bellek sınırlı (parça parça) toplulaştırma: küçük cihazlarda OOM'u önler, çıktı aynıdır
+PROCESSOR_CHUNKED = False
+# Parçalı modda hedeflenen bellek tavanı (MB)
+PROCESSOR_MEMORY_LIMIT_MB = 64
+
 # Kamera index deneme sırası (gerektiğinde güncelle)
 CAMERA_INDEX_CANDIDATES = [1, 2]
 
+# camera_scanner: cihaz başına açma/okuma zaman aşımı (saniye) ve sonuç önbelleği
+CAMERA_PROBE_TIMEOUT_SEC = 3.0
+CAMERA_CACHE_FILE = BASE_DIR / ".camera_cache.json"
+# Çalışan cihaz kayıtlarının geçerlilik süresi (saniye); sonra cihaz yeniden yoklanır
+CAMERA_CACHE_TTL_SEC = 3600
+# Açılamayan cihaz kayıtlarının geçerlilik süresi (saniye, tüm platformlarda); kamera sonradan takılabilir
+CAMERA_CACHE_NEGATIVE_TTL_SEC = 10 * 60
+# Yoklamada takılan (zaman aşımı) cihaz kayıtlarının geçerlilik süresi (saniye); sonraki açılışta beklenmez
+CAMERA_CACHE_TIMEOUT_TTL_SEC = 30 * 60
+
 # Streamlit dashboard'ında ham veri penceresi (dakika)
 DASH_LIVE_WINDOW_MIN = 30
+# Runtime yayıncısından istenen dakika/saat özeti penceresi (dakika); tam geçmiş CSV'lerdedir
+DASH_AGG_WINDOW_MIN = 24 * 60
+
+# Tek süreçli çalışma zamanı (runtime.py)
+# ROI (x, y, w, h); collector.py'de 'r' ile seçilen değer loglarda görünür.
+RUNTIME_ROI: tuple[int, int, int, int] | None = None
+# Yerel yayıncı (dashboard buradan okur)
+RUNTIME_PUBLISH_HOST = "127.0.0.1"
+RUNTIME_PUBLISH_PORT = 8766
+# Özet CSV'lerin diske yazılma periyodu (saniye)
+RUNTIME_AGG_FLUSH_SEC = 10
+# Yayıncının bellekte tuttuğu ham veri penceresi (dakika)
+RUNTIME_RECENT_WINDOW_MIN = 240
+
+# Yerel sorgu API'si (query_api.py)
+QUERY_API_HOST = "127.0.0.1"
+QUERY_API_PORT = 8765